@@ -0,0 +1,79 @@
+"""Benchmark the two sheet ingestion paths on synthetic data.
+
+Compares the Sheets values.batchGet path (JSON, column-major) with the
+Drive CSV export path (parsed by pyarrow) and reports gzip wire size and
+client-side inflate + decode + DataFrame build time. The fake serves
+locale-formatted values like the real APIs; network latency is not
+modelled. Parity between the two paths is covered by
+tests/test_sheet_data.py.
+
+    python bench_ingest.py --rows 5000 20000 100000 --locale en_GB
+"""
+import argparse
+import gzip
+import json
+import time
+
+from loadtest import FakeBackend
+from sheet_data import (
+    USED_COLUMNS, column_letter, frame_from_columns, frame_from_csv, locale_dayfirst
+)
+
+
+def values_payload(backend):
+    header = backend._values_get(range="'rfq'!1:1")["values"][0]
+    columns = [c for c in USED_COLUMNS if c in header]
+    ranges = [f"'rfq'!{column_letter(header.index(c))}2:{column_letter(header.index(c))}"
+              for c in columns]
+    result = backend._values_batch_get(ranges)
+    return columns, json.dumps(result).encode("utf-8")
+
+
+# Both APIs send gzip, so both decoders start by inflating the body
+def decode_values(columns, body, dayfirst):
+    result = json.loads(gzip.decompress(body))
+    arrays = [(vr.get("values") or [[]])[0] for vr in result["valueRanges"]]
+    return frame_from_columns(columns, arrays, dayfirst)
+
+
+def decode_csv(body, dayfirst):
+    return frame_from_csv(gzip.decompress(body), dayfirst=dayfirst)
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[5000, 20000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--locale", default="en_GB")
+    args = parser.parse_args(argv)
+
+    print(f"{'rows':>8} {'path':>7} {'wire KB':>9} {'decode ms':>10} {'frame KB':>9}")
+    for n_rows in args.rows:
+        backend = FakeBackend(n_rows, latency=0, locale=args.locale)
+        dayfirst = locale_dayfirst(backend._spreadsheets_get()["properties"]["locale"])
+
+        columns, values_body = values_payload(backend)
+        values_body = gzip.compress(values_body)
+        values_time, values_df = best_of(
+            lambda: decode_values(columns, values_body, dayfirst), args.repeat)
+
+        csv_body = gzip.compress(backend._files_export_media())
+        csv_time, csv_df = best_of(lambda: decode_csv(csv_body, dayfirst), args.repeat)
+
+        for path, wire, secs, df in (("values", len(values_body), values_time, values_df),
+                                     ("csv", len(csv_body), csv_time, csv_df)):
+            print(f"{n_rows:>8} {path:>7} {wire / 1024:>9.0f} {secs * 1000:>10.1f} "
+                  f"{df.memory_usage(deep=True).sum() / 1024:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
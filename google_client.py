@@ -0,0 +1,171 @@
+import errno
+import random
+import socket
+import ssl
+import threading
+import time
+
+from googleapiclient.errors import HttpError
+from httplib2 import ServerNotFoundError
+
+# Statuses Google asks clients to retry with backoff
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+# 403s that are really quota throttles, retried like a 429
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+# Socket errors googleapiclient treats as transient
+RETRYABLE_ERRNOS = {
+    getattr(errno, name) for name in
+    ("WSAETIMEDOUT", "ETIMEDOUT", "EPIPE", "ECONNABORTED", "ECONNREFUSED", "ECONNRESET")
+    if hasattr(errno, name)
+}
+
+
+def error_reason(error):
+    # Machine-readable reason of an HttpError ("rateLimitExceeded",
+    # "exportSizeLimitExceeded", ...), from error.errors[0].reason
+    details = getattr(error, "error_details", None)
+    if isinstance(details, list):
+        for detail in details:
+            if isinstance(detail, dict) and detail.get("reason"):
+                return detail["reason"]
+    return getattr(error, "reason", None)
+
+
+def is_rate_limited(error):
+    if not isinstance(error, HttpError):
+        return False
+    status = error.resp.status
+    return status == 429 or (status == 403 and error_reason(error) in RATE_LIMIT_REASONS)
+
+
+def is_transport_error(error):
+    if isinstance(error, (ssl.SSLError, socket.timeout, ConnectionError, ServerNotFoundError)):
+        return True
+    return isinstance(error, OSError) and error.errno in RETRYABLE_ERRNOS
+
+
+# ---------------------- RATE LIMITING ---------------------- #
+class TokenBucket:
+    def __init__(self, per_minute, clock=time.monotonic, sleep=time.sleep):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _reserve(self):
+        # Take a token now (possibly going negative) and return how long
+        # the caller has to wait before that token is actually available.
+        with self.lock:
+            now = self.clock()
+            elapsed = now - self.updated
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+
+# ---------------------- QUOTA-AWARE CLIENT ---------------------- #
+class QuotaClient:
+    """Runs googleapiclient requests under per-API quotas.
+
+    Every call takes a token from its API's bucket first, and retryable
+    failures (429, 5xx, dropped connections) are retried with exponential
+    backoff and full jitter until either `max_retries` or the per-call
+    `retry_budget` (seconds spent sleeping) runs out. Non-idempotent
+    requests (appends) are only retried on 429, which Google rejects
+    before applying the write.
+    """
+
+    def __init__(self, quotas, max_retries=5, retry_budget=30.0,
+                 base_delay=0.5, max_delay=16.0,
+                 clock=time.monotonic, sleep=time.sleep, rng=random.random):
+        self.buckets = {
+            api: TokenBucket(per_minute, clock=clock, sleep=sleep)
+            for api, per_minute in quotas.items()
+        }
+        self.max_retries = max_retries
+        self.retry_budget = retry_budget
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self.rng = rng
+        self.lock = threading.Lock()
+        self.counters = {
+            api: {"calls": 0, "retries": 0, "throttles": 0, "failures": 0}
+            for api in quotas
+        }
+
+    def _count(self, api, name):
+        with self.lock:
+            self.counters[api][name] += 1
+
+    def stats(self):
+        with self.lock:
+            return {api: dict(c) for api, c in self.counters.items()}
+
+    def _retry_delay(self, attempt, error):
+        # Honour Retry-After when the server sends one
+        retry_after = None
+        if isinstance(error, HttpError):
+            retry_after = error.resp.get("retry-after")
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return self.rng() * ceiling
+
+    @staticmethod
+    def _is_retryable(error, idempotent):
+        # A rate-limited request was rejected, so even writes are safe to
+        # resend; anything else may have been applied already.
+        if is_rate_limited(error):
+            return True
+        if not idempotent:
+            return False
+        if isinstance(error, HttpError):
+            return error.resp.status in RETRYABLE_STATUSES
+        return is_transport_error(error)
+
+    def execute(self, request, api, idempotent=True, max_retries=None, retry_budget=None):
+        # max_retries / retry_budget override the client defaults for one call
+        max_retries = self.max_retries if max_retries is None else max_retries
+        retry_budget = self.retry_budget if retry_budget is None else retry_budget
+        spent = 0.0
+        attempt = 0
+        while True:
+            if self.buckets[api].acquire() > 0:
+                self._count(api, "throttles")
+            self._count(api, "calls")
+
+            try:
+                return request.execute()
+            except Exception as error:
+                if not self._is_retryable(error, idempotent):
+                    self._count(api, "failures")
+                    raise
+
+                if is_rate_limited(error):
+                    self._count(api, "throttles")
+
+                delay = self._retry_delay(attempt, error)
+                if attempt >= max_retries or spent + delay > retry_budget:
+                    self._count(api, "failures")
+                    raise
+
+                self._count(api, "retries")
+                self.sleep(delay)
+                spent += delay
+                attempt += 1
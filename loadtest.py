@@ -0,0 +1,447 @@
+"""Concurrent-session load test for the RFQ dashboard (main.py).
+
+Drives many simulated sales-staff sessions through Streamlit's headless
+AppTest API against an in-process fake of the Sheets/Drive backend, and
+reports rerun latency percentiles, throughput, backend call counts and
+process memory for each session count.
+
+    python loadtest.py --sessions 50 100 200
+
+Streamlit 1.44's AppTest cannot drive st.file_uploader, so the harness
+swaps it for a stand-in that hands back whatever CSV the session has
+staged in session state. The rest of the upload panel (preview, action
+radio, Confirm Upload) is clicked through AppTest as usual.
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import resource
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest import mock
+
+import streamlit as st
+from googleapiclient.errors import HttpError
+from httplib2 import Response
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.runtime import Runtime
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.runtime.secrets import Secrets
+from streamlit.testing.v1 import AppTest
+
+from sheet_data import MONTH_FIRST_LOCALES, YEAR_FIRST_LOCALES
+
+APP_PATH = Path(__file__).parent / "main.py"
+
+GLOBAL_PASSWORD = "global-pass"
+DIVISIONS = ["Automation", "Electrical", "Instrumentation", "Mechanical", "Safety"]
+DIVISION_PASSWORDS = {d: f"{d.lower()}-pass" for d in DIVISIONS}
+STATUSES = ["Submitted", "Awarded", "Declined", "Under Review"]
+
+# Session-state key holding the CSV bytes a session is "uploading"
+UPLOAD_KEY = "_loadtest_upload"
+
+SECRETS = {
+    "GLOBAL_PASSWORD": GLOBAL_PASSWORD,
+    "DIVISION_PASSWORDS": DIVISION_PASSWORDS,
+    "DRIVE_SHEET_ID": "fake-sheet-id",
+    "gcp_service_account": {"type": "service_account"},
+}
+
+
+# ---------------------- FAKE BACKEND ---------------------- #
+def to_csv(rows):
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+def make_rows(n_rows, seed=0):
+    rng = random.Random(seed)
+    clients = [f"Client {i:03d}" for i in range(120)]
+    start = datetime(2025, 1, 1)
+    header = ["RFQ No", "Division", "Clients", "Affiliate", "Date", "Status",
+              "Value", "Owner", "Remarks"]
+    rows = [header]
+    for i in range(n_rows):
+        client = rng.choice(clients)
+        # The first date is 5 Jan, ambiguous as 05/01 vs 01/05, so a wrong
+        # day/month order can't hide behind pandas' format inference
+        day = 4 if i == 0 else rng.randint(0, 364)
+        rows.append([
+            f"RFQ-{i:06d}",
+            rng.choice(DIVISIONS),
+            client,
+            f"{client} / Site {rng.randint(1, 4)}",
+            (start + timedelta(days=day)).strftime("%Y-%m-%d"),
+            rng.choice(STATUSES),
+            str(rng.randint(1_000, 500_000)),
+            f"Owner {rng.randint(1, 40)}",
+            "",
+        ])
+    return rows
+
+
+def parse_iso(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def to_serial(value):
+    # Sheets returns date cells as days since 1899-12-30
+    parsed = parse_iso(value)
+    if parsed is None:
+        return value
+    return (parsed - datetime(1899, 12, 30)).days
+
+
+def to_display(value, locale):
+    # Date cells rendered the way Sheets shows them in the given locale
+    parsed = parse_iso(value)
+    if parsed is None:
+        return value
+    if locale in MONTH_FIRST_LOCALES:
+        return f"{parsed.month}/{parsed.day}/{parsed.year}"
+    if locale in YEAR_FIRST_LOCALES:
+        return parsed.strftime("%Y/%m/%d")
+    return parsed.strftime("%d/%m/%Y")
+
+
+class FakeRequest:
+    def __init__(self, backend, method, fn):
+        self.backend = backend
+        self.method = method
+        self.fn = fn
+
+    def execute(self, num_retries=0):
+        return self.backend.call(self.method, self.fn)
+
+
+class _Chain:
+    # Stands in for the googleapiclient resource objects:
+    # sheets.spreadsheets().values().get(...), drive.files().get(...)
+    def __init__(self, backend, prefix):
+        self.backend = backend
+        self.prefix = prefix
+
+    def __getattr__(self, name):
+        path = f"{self.prefix}.{name}"
+        handler = self.backend.handlers.get(path)
+        if handler is None:
+            return lambda *a, **k: _Chain(self.backend, path)
+        return lambda *a, **k: FakeRequest(self.backend, path, lambda: handler(**k))
+
+
+class FakeBackend:
+    """In-memory Sheets/Drive with injectable latency and errors.
+
+    Dates are stored as ISO text and served formatted in `locale`, like
+    the real APIs do, unless a serial-number rendering is requested.
+    """
+
+    def __init__(self, n_rows=5000, latency=0.15, error_rate=0.0, seed=0,
+                 locale="en_GB"):
+        self.values = make_rows(n_rows, seed)
+        self.locale = locale
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.modified = datetime.now(timezone.utc)
+        self.counts = {}
+        self.handlers = {
+            "sheets.spreadsheets.get": self._spreadsheets_get,
+            "sheets.spreadsheets.values.get": self._values_get,
+            "sheets.spreadsheets.values.batchGet": self._values_batch_get,
+            "sheets.spreadsheets.values.update": self._values_update,
+            "sheets.spreadsheets.values.append": self._values_append,
+            "drive.files.get": self._files_get,
+            "drive.files.export_media": self._files_export_media,
+        }
+
+    def build(self, service, version, credentials=None, **kwargs):
+        return _Chain(self, service)
+
+    def call(self, method, fn):
+        with self.lock:
+            self.counts[method] = self.counts.get(method, 0) + 1
+            fail = self.rng.random() < self.error_rate
+        time.sleep(self.latency)
+        if fail:
+            raise HttpError(Response({"status": 503}), b"backendError")
+        return fn()
+
+    def reset_counts(self):
+        with self.lock:
+            self.counts = {}
+
+    def _touch(self):
+        self.modified = datetime.now(timezone.utc)
+
+    def _formatted(self, rows):
+        return [[to_display(v, self.locale) for v in r] for r in rows]
+
+    def _spreadsheets_get(self, **kwargs):
+        return {"properties": {"locale": self.locale}}
+
+    def _values_get(self, range=None, **kwargs):
+        with self.lock:
+            if range and range.endswith("!1:1"):
+                return {"values": [list(self.values[0])]}
+            return {"values": self._formatted(self.values)}
+
+    def _values_batch_get(self, ranges, valueRenderOption="FORMATTED_VALUE",
+                          dateTimeRenderOption=None, **kwargs):
+        # Column-major ranges of the form 'sheet'!B1:B
+        value_ranges = []
+        with self.lock:
+            for r in ranges:
+                start = r.rsplit("!", 1)[1].split(":")[0]
+                letters = start.rstrip("0123456789")
+                first_row = int(start[len(letters):] or 1)
+                index = 0
+                for ch in letters:
+                    index = index * 26 + ord(ch) - ord("A") + 1
+                column = [row[index - 1] if index - 1 < len(row) else ""
+                          for row in self.values[first_row - 1:]]
+                if valueRenderOption == "FORMATTED_VALUE":
+                    column = [to_display(v, self.locale) for v in column]
+                elif dateTimeRenderOption == "SERIAL_NUMBER":
+                    column = [to_serial(v) for v in column]
+                while column and column[-1] == "":
+                    column.pop()
+                value_ranges.append({"range": r, "values": [column] if column else []})
+        return {"valueRanges": value_ranges}
+
+    def _values_update(self, body, **kwargs):
+        with self.lock:
+            self.values = [list(r) for r in body["values"]]
+            self._touch()
+        return {"updatedRows": len(body["values"])}
+
+    def _values_append(self, body, **kwargs):
+        with self.lock:
+            self.values.extend(list(r) for r in body["values"])
+            self._touch()
+        return {"updates": {"updatedRows": len(body["values"])}}
+
+    def _files_get(self, **kwargs):
+        with self.lock:
+            stamp = self.modified.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+        return {"modifiedTime": stamp}
+
+    def _files_export_media(self, mimeType=None, **kwargs):
+        with self.lock:
+            rows = self._formatted(self.values)
+        return to_csv(rows)
+
+
+# ---------------------- SESSION SCRIPT ---------------------- #
+def memory_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def fake_file_uploader(label, *args, **kwargs):
+    # Runs in the app's script thread, so st.session_state is the
+    # calling session's state
+    data = st.session_state.get(UPLOAD_KEY)
+    if data is None:
+        return None
+    uploaded = io.BytesIO(data)
+    uploaded.name = "rfq_upload.csv"
+    return uploaded
+
+
+def pick(rng, options):
+    return rng.choice(list(options))
+
+
+def upload(at, rng, backend, timed_run):
+    # Mostly appends of a few new RFQs; occasionally a full re-export
+    # replacing the sheet, as staff do
+    new_rows = make_rows(rng.randint(5, 50), seed=rng.random())
+    if rng.random() < 0.2:
+        action = "Replace Sheet"
+        rows = backend._values_get()["values"] + new_rows[1:]
+    else:
+        action = "Append to Sheet"
+        rows = new_rows
+
+    at.session_state[UPLOAD_KEY] = to_csv(rows)
+    timed_run()
+
+    at.sidebar.radio[0].set_value(action)
+    timed_run()
+
+    confirm = next(b for b in at.sidebar.button if b.label == "Confirm Upload")
+    confirm.click()
+    timed_run()
+    del at.session_state[UPLOAD_KEY]
+
+
+def run_session(idx, backend, args, latencies, errors):
+    rng = random.Random(idx)
+    time.sleep(rng.uniform(0, args.ramp))
+
+    at = AppTest.from_file(str(APP_PATH), default_timeout=args.timeout)
+
+    def timed_run():
+        started = time.perf_counter()
+        at.run()
+        latencies.append(time.perf_counter() - started)
+        if at.exception:
+            errors.append(at.exception[0].message)
+
+    timed_run()
+
+    # Login: global users vs division-locked users
+    if rng.random() < args.global_ratio:
+        password = GLOBAL_PASSWORD
+    else:
+        password = DIVISION_PASSWORDS[pick(rng, DIVISIONS)]
+    at.sidebar.text_input[0].input(password)
+    at.sidebar.button[0].click()
+    timed_run()
+
+    for _ in range(args.clicks):
+        if not at.sidebar.selectbox:
+            break
+        if at.sidebar.multiselect and rng.random() < args.upload_ratio:
+            # Only global users see the upload panel
+            upload(at, rng, backend, timed_run)
+            continue
+        action = rng.random()
+        if at.sidebar.multiselect and action < 0.3:
+            divisions = at.sidebar.multiselect[0].options
+            at.sidebar.multiselect[0].set_value(
+                rng.sample(divisions, rng.randint(1, len(divisions))))
+        elif action < 0.7:
+            client = at.sidebar.selectbox[0]
+            client.select(pick(rng, client.options))
+        else:
+            affiliate = at.sidebar.selectbox[1]
+            affiliate.select(pick(rng, affiliate.options))
+        timed_run()
+        time.sleep(rng.uniform(0, args.think_time))
+
+
+def run_level(n_sessions, backend, args):
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    backend.reset_counts()
+
+    latencies, errors = [], []
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessions) as pool:
+        futures = [pool.submit(run_session, i, backend, args, latencies, errors)
+                   for i in range(n_sessions)]
+        for f in futures:
+            try:
+                f.result()
+            except Exception as exc:
+                errors.append(repr(exc))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "sessions": n_sessions,
+        "reruns": len(latencies),
+        "errors": len(errors),
+        "latencies": sorted(latencies),
+        "elapsed": elapsed,
+        "counts": dict(backend.counts),
+        "rss_mb": memory_mb(),
+        "first_error": errors[0] if errors else None,
+    }
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return float("nan")
+    k = (len(sorted_values) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def report(result):
+    lat = result["latencies"]
+    print(
+        f"{result['sessions']:>8} {result['reruns']:>7} {result['errors']:>6} "
+        f"{percentile(lat, 50) * 1000:>8.0f} {percentile(lat, 95) * 1000:>8.0f} "
+        f"{percentile(lat, 99) * 1000:>8.0f} "
+        f"{(statistics.mean(lat) if lat else 0) * 1000:>8.0f} "
+        f"{result['reruns'] / result['elapsed']:>9.1f} {result['rss_mb']:>8.0f}"
+    )
+    calls = ", ".join(f"{k.split('.', 1)[1]}={v}" for k, v in sorted(result["counts"].items()))
+    print(f"{'':>8} backend calls: {calls or 'none'}")
+    if result["first_error"]:
+        print(f"{'':>8} first error: {result['first_error']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--clicks", type=int, default=5, help="filter changes per session")
+    parser.add_argument("--global-ratio", type=float, default=0.3,
+                        help="share of sessions using the global password")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which sessions start")
+    parser.add_argument("--think-time", type=float, default=0.5, help="max pause between clicks")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.15, help="backend latency per call (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls failing with 503")
+    parser.add_argument("--upload-ratio", type=float, default=0.05,
+                        help="chance that a global user's click is an upload instead")
+    parser.add_argument("--timeout", type=float, default=120.0, help="per-rerun timeout (s)")
+    parser.add_argument("--ingestion", choices=["values", "csv"], default="values",
+                        help="SHEET_INGESTION setting passed to the app")
+    parser.add_argument("--locale", default="en_GB", help="spreadsheet locale the fake formats dates in")
+    args = parser.parse_args(argv)
+
+    backend = FakeBackend(args.rows, args.latency, args.error_rate, locale=args.locale)
+
+    # AppTest swaps st.secrets and Runtime._instance around every run and
+    # compiles the script afresh each time, which races between threads
+    # (CPython 3.11's parser is not thread-safe). Install one fake runtime,
+    # script cache and set of secrets for the process, like a server has.
+    secrets = Secrets()
+    secrets._secrets = dict(SECRETS, SHEET_INGESTION=args.ingestion)
+    st.secrets = secrets
+
+    runtime = mock.MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    script_cache = ScriptCache()
+
+    print(f"{'sessions':>8} {'reruns':>7} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'mean ms':>8} {'reruns/s':>9} {'RSS MB':>8}")
+    with mock.patch("googleapiclient.discovery.build", backend.build), \
+            mock.patch("google.oauth2.service_account.Credentials.from_service_account_info",
+                       lambda *a, **k: object()), \
+            mock.patch.object(Runtime, "instance", lambda: runtime), \
+            mock.patch.object(Runtime, "exists", lambda: True), \
+            mock.patch("streamlit.file_uploader", fake_file_uploader), \
+            mock.patch("streamlit.testing.v1.app_test.ScriptCache", lambda: script_cache), \
+            mock.patch("streamlit.testing.v1.local_script_runner.ScriptCache", lambda: script_cache):
+        for n in args.sessions:
+            report(run_level(n, backend, args))
+            sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
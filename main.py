@@ -3,10 +3,20 @@ import pandas as pd
 import altair as alt
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from datetime import datetime
+import logging
+import time
+
+from google_client import QuotaClient, error_reason
+from sheet_data import (
+    USED_COLUMNS, column_letter, frame_from_columns, frame_from_csv, locale_dayfirst
+)
 
 alt.themes.enable("none")
 
+logger = logging.getLogger(__name__)
+
 # -----------------------------------------------------
 # Make Screen Wide
 # -----------------------------------------------------
@@ -153,6 +163,16 @@ st.markdown("""
 SPREADSHEET_ID = st.secrets["DRIVE_SHEET_ID"]
 RANGE = "rfq_2025.csv"  # Full range
 
+# How the sheet is pulled in: "values" (Sheets batchGet of the used
+# columns) or "csv" (gzip-compressed Drive CSV export parsed by pyarrow).
+# The CSV export covers the spreadsheet's first tab only, and Drive
+# refuses exports over 10 MB; larger sheets fall back to "values".
+SHEET_INGESTION = st.secrets.get("SHEET_INGESTION", "values")
+
+# Requests per minute allowed per API (per-user read quotas for the
+# service account); calls beyond this wait instead of drawing 429s.
+API_QUOTAS = {"sheets": 60, "drive": 600}
+
 # ---------------------- GOOGLE CONNECTION ---------------------- #
 @st.cache_resource
 def connect_to_google():
@@ -165,185 +185,329 @@ def connect_to_google():
     )
     return creds
 
-# ---------------------- LOAD SHEET ---------------------- #
-@st.cache_data()
-def load_sheet():
-    creds = connect_to_google()
-    sheets_api = build("sheets", "v4", credentials=creds)
-
-    result = sheets_api.spreadsheets().values().get(
-        spreadsheetId=SPREADSHEET_ID,
-        range=RANGE
-    ).execute()
-
-    values = result.get("values", [])
-    if not values:
-        return pd.DataFrame()
-
-    return pd.DataFrame(values[1:], columns=values[0])
-
-@st.cache_data()
-def get_csv_last_modified_time():
+# Shared across sessions so quotas and counters are process-wide
+@st.cache_resource
+def google_client():
+    return QuotaClient(API_QUOTAS)
+
+# ---------------------- DATA VERSION ---------------------- #
+# The sheet's Drive modifiedTime is the data version. Metadata is cheap,
+# so it is re-checked every minute; the sheet itself is only re-downloaded
+# when the version changes.
+VERSION_TTL_SECONDS = 60
+
+# Every rerun asks for the version, so it gets a short retry budget: a
+# stale "Last Updated" beats a page stuck in backoff.
+@st.cache_data(ttl=VERSION_TTL_SECONDS)
+def get_sheet_version():
     creds = connect_to_google()
     drive_service = build("drive", "v3", credentials=creds)
 
-    file = drive_service.files().get(
-        fileId=SPREADSHEET_ID,
-        fields="modifiedTime"
-    ).execute()
+    file = google_client().execute(
+        drive_service.files().get(
+            fileId=SPREADSHEET_ID,
+            fields="modifiedTime"
+        ),
+        api="drive",
+        max_retries=1,
+        retry_budget=2.0
+    )
 
-    modified_time = file["modifiedTime"]
+    return file["modifiedTime"]
+
+def get_csv_last_modified_time(modified_time):
     return datetime.fromisoformat(modified_time.replace("Z", "")).strftime(
         "%d-%b-%Y"
     )
 
+# ---------------------- LOAD SHEET ---------------------- #
+# `version` is only part of the cache key: a new modifiedTime means a new
+# entry, and old versions fall out through max_entries. Streamlit takes a
+# per-key lock on a miss, so sessions missing together share one fetch
+# when it succeeds; errors are not cached, so after a failure each waiter
+# retries in turn. current_version() backs off to keep that rare. The frame is a shared resource rather than a per-call copy, so it must
+# never be modified in place.
+@st.cache_resource(max_entries=2)
+def load_sheet(version):
+    if SHEET_INGESTION == "csv":
+        df = load_sheet_csv()
+    else:
+        df = load_sheet_values()
 
-# -----------------------------------------------------
-# Sidebar Login
-# -----------------------------------------------------
-if not st.session_state.authenticated:
-    st.sidebar.title("🔐 Login")
+    df['Division'] = df['Division'].astype(str).str.strip()
+    df['Clients'] = df['Clients'].astype(str).str.strip()
+    df['Affiliate'] = df['Affiliate'].astype(str).str.strip()
+    df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+    return df
 
-    password_input = st.sidebar.text_input(
-        "Enter Password",
-        type="password"
+# Both ingestion paths see dates as the sheet displays them, so their
+# day/month order follows the spreadsheet's locale. Looked up once.
+@st.cache_resource
+def sheet_dayfirst():
+    creds = connect_to_google()
+    sheets_api = build("sheets", "v4", credentials=creds)
+
+    spreadsheet = google_client().execute(
+        sheets_api.spreadsheets().get(
+            spreadsheetId=SPREADSHEET_ID,
+            fields="properties.locale"
+        ),
+        api="sheets"
     )
+    return locale_dayfirst(spreadsheet["properties"]["locale"])
 
-    login_btn = st.sidebar.button("Login")
+# Resolved once from the header row and shared across sessions; each
+# range starts at row 1, so every fetch re-checks its header cell and a
+# moved column triggers a fresh lookup instead of an extra read per load.
+@st.cache_resource
+def column_ranges():
+    return {"ranges": {}}
+
+def resolve_column_ranges(values_api):
+    header = google_client().execute(
+        values_api.get(
+            spreadsheetId=SPREADSHEET_ID,
+            range=f"'{RANGE}'!1:1"
+        ),
+        api="sheets"
+    ).get("values", [[]])[0]
+
+    ranges = {}
+    for name in USED_COLUMNS:
+        if name in header:
+            letter = column_letter(header.index(name))
+            ranges[name] = f"'{RANGE}'!{letter}1:{letter}"
+    return ranges
+
+def fetch_columns(values_api, ranges):
+    # Column-major, so each array lands directly in the DataFrame
+    # without per-row lists. Formatted values keep codes like "0123"
+    # exactly as shown and match what the CSV export returns.
+    result = google_client().execute(
+        values_api.batchGet(
+            spreadsheetId=SPREADSHEET_ID,
+            ranges=list(ranges.values()),
+            majorDimension="COLUMNS",
+            valueRenderOption="FORMATTED_VALUE"
+        ),
+        api="sheets"
+    )
+    return [
+        (vr.get("values") or [[]])[0]
+        for vr in result.get("valueRanges", [])
+    ]
 
-    if login_btn:
-        if password_input == GLOBAL_PASSWORD:
-            load_sheet.clear()
-            st.session_state.authenticated = True
-            st.session_state.user_division = None
-            st.rerun()
+def load_sheet_values():
+    creds = connect_to_google()
+    sheets_api = build("sheets", "v4", credentials=creds)
+    values_api = sheets_api.spreadsheets().values()
 
-        elif password_input in DIVISION_PASSWORDS.values():
-            division = [
-                d for d, p in DIVISION_PASSWORDS.items()
-                if p == password_input
-            ][0]
-            
-            load_sheet.clear()
-            st.session_state.authenticated = True
-            st.session_state.user_division = division
-            st.rerun()
-        else:
-            st.sidebar.error("Incorrect password ❌")
+    state = column_ranges()
+    ranges = state["ranges"] or resolve_column_ranges(values_api)
+    if not ranges:
+        return pd.DataFrame()
 
-    st.stop()
+    arrays = fetch_columns(values_api, ranges)
+    if [a[:1] for a in arrays] != [[name] for name in ranges]:
+        # Header changed since the ranges were resolved (e.g. a Replace
+        # upload with reordered columns)
+        ranges = resolve_column_ranges(values_api)
+        if not ranges:
+            return pd.DataFrame()
+        arrays = fetch_columns(values_api, ranges)
+    state["ranges"] = ranges
+
+    return frame_from_columns(
+        list(ranges), [a[1:] for a in arrays], dayfirst=sheet_dayfirst()
+    )
 
-#st.sidebar.success("Logged in")
+def load_sheet_csv():
+    creds = connect_to_google()
+    drive_service = build("drive", "v3", credentials=creds)
 
+    # The client sends Accept-Encoding: gzip, so the export comes over
+    # the wire compressed and is inflated on receipt.
+    try:
+        data = google_client().execute(
+            drive_service.files().export_media(
+                fileId=SPREADSHEET_ID,
+                mimeType="text/csv"
+            ),
+            api="drive"
+        )
+    except HttpError as error:
+        if error_reason(error) != "exportSizeLimitExceeded":
+            raise
+        logger.warning("Sheet is over the 10 MB export limit; reading it through the values API")
+        return load_sheet_values()
+    if not data:
+        return pd.DataFrame()
+
+    return frame_from_csv(data, dayfirst=sheet_dayfirst())
+
+# Process-wide last good version plus a tally of metadata lookups that
+# failed after the client's retries, so an outage shows up in the logs
+# and counters, not just as a stale "Last Updated".
+@st.cache_resource
+def version_state():
+    return {"last": None, "failures": 0, "failed_at": None}
+
+def current_version():
+    # On failure keep serving the last version seen rather than a `None`
+    # key, which would take one of load_sheet's two slots and refetch.
+    # Errors are not cached either, so after one, skip the lookup for a
+    # TTL instead of queueing every session behind another failing call.
+    state = version_state()
+    failed_at = state["failed_at"]
+    if failed_at is not None and time.monotonic() - failed_at < VERSION_TTL_SECONDS:
+        return state["last"]
+    try:
+        state["last"] = get_sheet_version()
+        state["failed_at"] = None
+    except Exception:
+        state["failures"] += 1
+        state["failed_at"] = time.monotonic()
+        logger.warning(
+            "Sheet metadata lookup failed (%d so far)",
+            state["failures"], exc_info=True
+        )
+    return state["last"]
 
-try:
-    last_upload = get_csv_last_modified_time()
-    st.sidebar.info(f"📅 Last Updated:\n{last_upload}")
-except Exception:
-    st.sidebar.warning("📅 Last Updated:\nNot available")
 
 # -----------------------------------------------------
-# Load Data from Google Sheets
+# Cached Views
 # -----------------------------------------------------
-df = load_sheet()
-
-df['Division'] = df['Division'].astype(str).str.strip()
-df['Clients'] = df['Clients'].astype(str).str.strip()
-df['Affiliate'] = df['Affiliate'].astype(str).str.strip()
-df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+# Each view is keyed on the data version plus only the filters it reads,
+# so a rerun recomputes just the sections whose inputs actually changed.
+VIEW_CACHE_ENTRIES = 256
+
+def filter_sheet(version, divisions, client, affiliate):
+    df = load_sheet(version)
+    if divisions:
+        df = df[df['Division'].isin(divisions)]
+    if client != "All":
+        df = df[df['Clients'] == client]
+    if affiliate != "All":
+        df = df[df['Affiliate'] == affiliate]
+    return df
+
+@st.cache_data(max_entries=VIEW_CACHE_ENTRIES)
+def division_options(version):
+    df = load_sheet(version)
+    return sorted(df['Division'].dropna().unique())
+
+@st.cache_data(max_entries=VIEW_CACHE_ENTRIES)
+def client_options(version, divisions):
+    df = load_sheet(version)
+    if divisions:
+        return sorted(df[df['Division'].isin(divisions)]['Clients'].dropna().unique())
+    return sorted(df['Clients'].dropna().unique())
+
+@st.cache_data(max_entries=VIEW_CACHE_ENTRIES)
+def affiliate_options(version, divisions, client):
+    df = load_sheet(version)
+    if client == "All":
+        return sorted(df[df['Division'].isin(divisions)]['Affiliate'].dropna().unique())
+    return sorted(
+        df[(df['Division'].isin(divisions)) & (df['Clients'] == client)]['Affiliate'].dropna().unique()
+    )
 
-st.sidebar.header("🔎 Filter Options")
+@st.cache_data(max_entries=VIEW_CACHE_ENTRIES)
+def status_summary(version, divisions, client, affiliate):
+    filtered_df = filter_sheet(version, divisions, client, affiliate)
 
-# --------------------------------------------------------
-# 🔵 DIVISION FILTER (Restricted)
-# --------------------------------------------------------
+    status_counts = filtered_df['Status'].value_counts()
+    status_percentage = (status_counts / status_counts.sum()) * 100
+    result_df = pd.DataFrame({
+        "Status": status_counts.index,
+        "RFQ Count": status_counts.values,
+        "Percentage (%)": status_percentage.round(2).values
+    }).reset_index(drop=True)
 
-if st.session_state.user_division:
-    selected_divisions = [st.session_state.user_division]
-    st.sidebar.markdown(
-        f"""
-        <div style="
-            background-color: #2196F3;
-            color: #ff0022;
-            padding: 10px 12px;
-            border-radius: 8px;
-            font-weight: 700;
-            margin-top: 8px;
-            border-left: 5px solid #4b7bec;
-        ">
-            🔒 Division Locked<br> <span style="font-size: 14px;">{st.session_state.user_division}</span>
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
+    total_rfqs = filtered_df.shape[0]
+    awarded = filtered_df[filtered_df['Status'].str.lower() == "awarded"].shape[0]
+    declined = filtered_df[filtered_df['Status'].str.lower() == "declined"].shape[0]
 
-else:
-    # Global user → full access
-    division_list = sorted(df['Division'].dropna().unique())
+    awarded_ratio = (awarded / total_rfqs) * 100 if total_rfqs > 0 else 0
+    declined_ratio = (declined / total_rfqs) * 100 if total_rfqs > 0 else 0
 
-    selected_divisions = st.sidebar.multiselect(
-        "Select Division(s)",
-        options=division_list,
-        default=division_list
-    )
+    return result_df, total_rfqs, awarded_ratio, declined_ratio
 
-# Client Dropdown
-if selected_divisions:
-    filtered_clients = sorted(df[df['Division'].isin(selected_divisions)]['Clients'].dropna().unique())
-else:
-    filtered_clients = sorted(df['Clients'].dropna().unique())
-client_list = ["All"] + filtered_clients
-selected_client = st.sidebar.selectbox("Select Client", client_list)
+# Top clients ignore the client/affiliate selection on purpose
+@st.cache_data(max_entries=VIEW_CACHE_ENTRIES)
+def top_clients(version, divisions):
+    df = load_sheet(version)
+    if divisions:
+        division_filtered_df = df[df['Division'].isin(divisions)]
+    else:
+        division_filtered_df = df
 
-# Affiliate Dropdown
-if selected_client == "All":
-    filtered_affiliates = sorted(df[df['Division'].isin(selected_divisions)]['Affiliate'].dropna().unique())
-else:
-    filtered_affiliates = sorted(
-        df[(df['Division'].isin(selected_divisions)) & (df['Clients'] == selected_client)]['Affiliate'].dropna().unique()
+    return (
+        division_filtered_df
+        .groupby("Clients")
+        .size()
+        .reset_index(name="RFQ Count")
+        .sort_values("RFQ Count", ascending=False)
+        .head(10)
     )
-affiliate_list = ["All"] + filtered_affiliates
-selected_affiliate = st.sidebar.selectbox("Select Affiliate", affiliate_list)
 
+@st.cache_data(max_entries=VIEW_CACHE_ENTRIES)
+def monthly_trend(version, divisions, client, affiliate):
+    filtered_df = filter_sheet(version, divisions, client, affiliate)
 
-if st.sidebar.button("🚪 Logout"):
-    load_sheet.clear()
-    get_csv_last_modified_time.clear()
-    st.session_state.clear()
-    st.rerun()
-
+    trend_df = filtered_df.dropna(subset=['Date']).copy()
+    trend_df['Month'] = trend_df['Date'].dt.to_period('M').astype(str)
 
-# Final Filtering
-filtered_df = df.copy()
-if selected_divisions:
-    filtered_df = filtered_df[filtered_df['Division'].isin(selected_divisions)]
-if selected_client != "All":
-    filtered_df = filtered_df[filtered_df['Clients'] == selected_client]
-if selected_affiliate != "All":
-    filtered_df = filtered_df[filtered_df['Affiliate'] == selected_affiliate]
+    return (
+        trend_df
+        .groupby("Month")
+        .size()
+        .reset_index(name="RFQ Count")
+    )
 
-# ---------------------- SIDEBAR: UPLOAD ---------------------- #
-if st.session_state.get("user_division") is None:
+@st.cache_data(max_entries=VIEW_CACHE_ENTRIES)
+def client_affiliate_counts(version, divisions, client, affiliate):
+    return (
+        filter_sheet(version, divisions, client, affiliate)
+        .groupby(['Clients', 'Affiliate'])
+        .size()
+        .reset_index(name='RFQ Count')
+        .sort_values('RFQ Count', ascending=False)
+    )
 
-    st.sidebar.markdown("---")
-    st.sidebar.header("📤 Upload Options")
 
-    uploaded_file = st.sidebar.file_uploader(
+# -----------------------------------------------------
+# Dashboard Sections
+# -----------------------------------------------------
+# The upload panel is a fragment: its widgets rerun only the panel, never
+# the charts. A confirmed upload reruns the whole app so every section
+# picks up the new version.
+@st.fragment
+def upload_panel():
+    st.markdown("---")
+    st.header("📤 Upload Options")
+
+    # Set just before the full-app rerun that follows an upload
+    upload_message = st.session_state.pop("upload_message", None)
+    if upload_message:
+        st.success(upload_message)
+
+    uploaded_file = st.file_uploader(
         "Upload RFQ file",
         type="csv"
     )
 
     if uploaded_file:
         upload_df = pd.read_csv(uploaded_file)
-        st.sidebar.subheader("Preview of Uploaded CSV")
-        st.sidebar.dataframe(upload_df.head(5))
+        st.subheader("Preview of Uploaded CSV")
+        st.dataframe(upload_df.head(5))
 
-        upload_action = st.sidebar.radio(
+        upload_action = st.radio(
             "Choose Upload Action",
             options=["Replace Sheet", "Append to Sheet"]
         )
 
-        if st.sidebar.button("Confirm Upload"):
+        if st.button("Confirm Upload"):
 
             creds = connect_to_google()
             sheets_api = build("sheets", "v4", credentials=creds)
@@ -353,42 +517,40 @@ if st.session_state.get("user_division") is None:
 
             # REPLACE SHEET
             if upload_action == "Replace Sheet":
-                sheets_api.spreadsheets().values().update(
-                    spreadsheetId=SPREADSHEET_ID,
-                    range=RANGE,
-                    valueInputOption="RAW",
-                    body=body
-                ).execute()
-                st.sidebar.success(f"✅ Sheet replaced with {len(upload_df)} rows")
+                google_client().execute(
+                    sheets_api.spreadsheets().values().update(
+                        spreadsheetId=SPREADSHEET_ID,
+                        range=RANGE,
+                        valueInputOption="RAW",
+                        body=body
+                    ),
+                    api="sheets"
+                )
+                get_sheet_version.clear()
+                st.session_state.upload_message = f"✅ Sheet replaced with {len(upload_df)} rows"
+                st.rerun(scope="app")
 
             # APPEND TO SHEET
             else:
-                sheets_api.spreadsheets().values().append(
-                    spreadsheetId=SPREADSHEET_ID,
-                    range=RANGE,
-                    valueInputOption="RAW",
-                    insertDataOption="INSERT_ROWS",
-                    body={"values": upload_df.values.tolist()}
-                ).execute()
-                st.sidebar.success(f"✅ {len(upload_df)} rows appended successfully")
-
-# Status Count + KPI Cards
-if not filtered_df.empty:
-    status_counts = filtered_df['Status'].value_counts()
-    status_percentage = (status_counts / status_counts.sum()) * 100
-    result_df = pd.DataFrame({
-        "Status": status_counts.index,
-        "RFQ Count": status_counts.values,
-        "Percentage (%)": status_percentage.round(2).values
-    }).reset_index(drop=True)
-
-    total_rfqs = filtered_df.shape[0]
-    awarded = filtered_df[filtered_df['Status'].str.lower() == "awarded"].shape[0]
-    submitted = filtered_df[filtered_df['Status'].str.lower() == "submitted"].shape[0]
-    declined = filtered_df[filtered_df['Status'].str.lower() == "declined"].shape[0]
+                google_client().execute(
+                    sheets_api.spreadsheets().values().append(
+                        spreadsheetId=SPREADSHEET_ID,
+                        range=RANGE,
+                        valueInputOption="RAW",
+                        insertDataOption="INSERT_ROWS",
+                        body={"values": upload_df.values.tolist()}
+                    ),
+                    api="sheets",
+                    idempotent=False
+                )
+                get_sheet_version.clear()
+                st.session_state.upload_message = f"✅ {len(upload_df)} rows appended successfully"
+                st.rerun(scope="app")
 
-    awarded_ratio = (awarded / total_rfqs) * 100 if total_rfqs > 0 else 0
-    declined_ratio = (declined / total_rfqs) * 100 if total_rfqs > 0 else 0
+def kpi_cards(version, divisions, client, affiliate):
+    _, total_rfqs, awarded_ratio, declined_ratio = status_summary(
+        version, divisions, client, affiliate
+    )
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -398,23 +560,14 @@ if not filtered_df.empty:
     with col3:
         st.markdown(f'<div class="kpi-card"><div class="kpi-title">Declined Ratio</div><div class="kpi-value">{declined_ratio:.2f}%</div></div>', unsafe_allow_html=True)
 
+def status_and_top_clients(version, divisions, client, affiliate):
+    result_df = status_summary(version, divisions, client, affiliate)[0]
+
     # ---------------------------
     # Top 5 Clients by RFQ Count
     # ---------------------------
-    if selected_divisions:
-        division_filtered_df = df[df['Division'].isin(selected_divisions)]
-    else:
-        division_filtered_df = df.copy()
+    top_clients_df = top_clients(version, divisions)
 
-    top_clients_df = (
-        division_filtered_df
-        .groupby("Clients")
-        .size()
-        .reset_index(name="RFQ Count")
-        .sort_values("RFQ Count", ascending=False)
-        .head(10)
-    )
-    
     col_left, spacer, col_right = st.columns([0.8, 0.1, 1])
 
     # ---------------------------
@@ -524,18 +677,10 @@ if not filtered_df.empty:
 
     st.altair_chart(chart, use_container_width=True)
 
-
+def rfq_trend(version, divisions, client, affiliate):
     st.subheader("📈 RFQ Trend Over Time")
 
-    trend_df = filtered_df.dropna(subset=['Date'])
-    trend_df['Month'] = trend_df['Date'].dt.to_period('M').astype(str)
-
-    monthly_counts = (
-        trend_df
-        .groupby("Month")
-        .size()
-        .reset_index(name="RFQ Count")
-    )
+    monthly_counts = monthly_trend(version, divisions, client, affiliate)
 
     line_chart = (
         alt.Chart(monthly_counts)
@@ -559,19 +704,13 @@ if not filtered_df.empty:
 
     st.altair_chart(line_chart, use_container_width=True)
 
-
-        # ---------------------------
+def client_affiliate_table(version, divisions, client, affiliate):
+    # ---------------------------
     # Client–Affiliate RFQ Count Table
     # ---------------------------
     st.subheader("📋 RFQs Received by Client & Affiliate")
 
-    client_affiliate_df = (
-        filtered_df
-        .groupby(['Clients', 'Affiliate'])
-        .size()
-        .reset_index(name='RFQ Count')
-        .sort_values('RFQ Count', ascending=False)
-    )
+    client_affiliate_df = client_affiliate_counts(version, divisions, client, affiliate)
 
     if not client_affiliate_df.empty:
         st.dataframe(
@@ -581,6 +720,120 @@ if not filtered_df.empty:
         )  
     else:
         st.info("No RFQs found for the selected Client/Affiliate filters.")       
+
+
+# -----------------------------------------------------
+# Sidebar Login
+# -----------------------------------------------------
+if not st.session_state.authenticated:
+    st.sidebar.title("🔐 Login")
+
+    password_input = st.sidebar.text_input(
+        "Enter Password",
+        type="password"
+    )
+
+    login_btn = st.sidebar.button("Login")
+
+    if login_btn:
+        if password_input == GLOBAL_PASSWORD:
+            st.session_state.authenticated = True
+            st.session_state.user_division = None
+            st.rerun()
+
+        elif password_input in DIVISION_PASSWORDS.values():
+            division = [
+                d for d, p in DIVISION_PASSWORDS.items()
+                if p == password_input
+            ][0]
+
+            st.session_state.authenticated = True
+            st.session_state.user_division = division
+            st.rerun()
+        else:
+            st.sidebar.error("Incorrect password ❌")
+
+    st.stop()
+
+#st.sidebar.success("Logged in")
+
+
+# -----------------------------------------------------
+# Load Data from Google Sheets
+# -----------------------------------------------------
+version = current_version()
+
+if version:
+    last_upload = get_csv_last_modified_time(version)
+    st.sidebar.info(f"📅 Last Updated:\n{last_upload}")
+else:
+    st.sidebar.warning("📅 Last Updated:\nNot available")
+
+st.sidebar.header("🔎 Filter Options")
+
+# --------------------------------------------------------
+# 🔵 DIVISION FILTER (Restricted)
+# --------------------------------------------------------
+
+if st.session_state.user_division:
+    selected_divisions = [st.session_state.user_division]
+    st.sidebar.markdown(
+        f"""
+        <div style="
+            background-color: #2196F3;
+            color: #ff0022;
+            padding: 10px 12px;
+            border-radius: 8px;
+            font-weight: 700;
+            margin-top: 8px;
+            border-left: 5px solid #4b7bec;
+        ">
+            🔒 Division Locked<br> <span style="font-size: 14px;">{st.session_state.user_division}</span>
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+else:
+    # Global user → full access
+    division_list = division_options(version)
+
+    selected_divisions = st.sidebar.multiselect(
+        "Select Division(s)",
+        options=division_list,
+        default=division_list
+    )
+
+# Cache keys have to be hashable
+selected_divisions = tuple(selected_divisions)
+
+# Client Dropdown
+client_list = ["All"] + client_options(version, selected_divisions)
+selected_client = st.sidebar.selectbox("Select Client", client_list)
+
+# Affiliate Dropdown
+affiliate_list = ["All"] + affiliate_options(version, selected_divisions, selected_client)
+selected_affiliate = st.sidebar.selectbox("Select Affiliate", affiliate_list)
+
+
+if st.sidebar.button("🚪 Logout"):
+    st.session_state.clear()
+    st.rerun()
+
+
+# ---------------------- SIDEBAR: UPLOAD ---------------------- #
+if st.session_state.get("user_division") is None:
+    with st.sidebar:
+        upload_panel()
+
+# Status Count + KPI Cards
+filters = (version, selected_divisions, selected_client, selected_affiliate)
+
+if status_summary(*filters)[1] > 0:
+    kpi_cards(*filters)
+    status_and_top_clients(*filters)
+    rfq_trend(*filters)
+    client_affiliate_table(*filters)
 else:
     st.warning("⚠️ No data found for the selected filters.")
 
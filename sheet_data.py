@@ -0,0 +1,94 @@
+import csv
+import io
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+# Columns the dashboard reads; everything else stays in the sheet
+USED_COLUMNS = ["Division", "Clients", "Affiliate", "Date", "Status"]
+
+
+def column_letter(index):
+    # 0 -> A, 25 -> Z, 26 -> AA
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord("A") + rem) + letters
+    return letters
+
+
+# Sheets locales whose short dates put the month first or the year first;
+# every other locale writes day/month/year.
+MONTH_FIRST_LOCALES = {"en_US", "es_US", "en_PH", "fil_PH"}
+YEAR_FIRST_LOCALES = {
+    "ja_JP", "zh_CN", "zh_TW", "zh_HK", "ko_KR", "hu_HU", "lt_LT",
+    "sv_SE", "en_CA", "fr_CA",
+}
+
+
+def locale_dayfirst(locale):
+    # Spreadsheet locale (spreadsheets.get -> properties.locale) to the
+    # day/month order of its formatted dates
+    return locale not in MONTH_FIRST_LOCALES | YEAR_FIRST_LOCALES
+
+
+def sheet_dates(values, dayfirst=False):
+    # Dates arrive as the sheet displays them, in its locale. ISO text
+    # (e.g. from RAW uploads) is taken as-is; dayfirst would misread
+    # 2025-01-05 as year/day/month.
+    col = pd.Series(values, dtype="object").replace("", None)
+    iso = pd.to_datetime(col, format="ISO8601", errors="coerce")
+    local = pd.to_datetime(col.where(iso.isna()), dayfirst=dayfirst, errors="coerce")
+    return iso.fillna(local)
+
+
+# ---------------------- VALUES API (column-major) ---------------------- #
+def frame_from_columns(names, arrays, dayfirst=False):
+    # Trailing blank cells are trimmed per column, so pad to the longest.
+    # Blanks stay "" like they do in the CSV export.
+    n_rows = max((len(a) for a in arrays), default=0)
+    data = {}
+    for name, arr in zip(names, arrays):
+        arr = [str(v) for v in arr] + [""] * (n_rows - len(arr))
+        if name == "Date":
+            data[name] = sheet_dates(arr, dayfirst)
+        else:
+            data[name] = pd.Series(arr, dtype="object")
+    return pd.DataFrame(data)
+
+
+# ---------------------- CSV EXPORT ---------------------- #
+def frame_from_csv(data, columns=USED_COLUMNS, dayfirst=False):
+    # pyarrow parses in parallel and only materializes the projected
+    # columns; text stays text so client codes like "0123" survive.
+    # Cells such as remarks can hold line breaks, which the parallel
+    # chunker must know about or it splits rows mid-cell.
+    end = data.find(b"\n")
+    first_line = data[:end if end >= 0 else len(data)].rstrip(b"\r").decode("utf-8-sig")
+    header = next(csv.reader([first_line]), [])
+    columns = [c for c in columns if c in header]
+
+    table = pa_csv.read_csv(
+        io.BytesIO(data),
+        read_options=pa_csv.ReadOptions(use_threads=True),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns,
+            column_types={c: pa.string() for c in columns},
+            strings_can_be_null=False,
+        ),
+    )
+
+    df = table.to_pandas()
+    # The values API trims trailing blank cells per column, so rows past
+    # the last one with a used cell filled don't exist on that path
+    filled = (df != "").any(axis=1).to_numpy().nonzero()[0]
+    df = df.iloc[:filled[-1] + 1 if len(filled) else 0]
+    for name in columns:
+        if name == "Date":
+            df[name] = sheet_dates(df[name].tolist(), dayfirst)
+        else:
+            df[name] = df[name].astype("object")
+    return df
@@ -0,0 +1,245 @@
+import errno
+import json
+import socket
+import ssl
+
+import pytest
+from googleapiclient.errors import HttpError
+from httplib2 import Response, ServerNotFoundError
+
+from google_client import QuotaClient, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeRequest:
+    """Fails with the scripted errors in order, then returns "ok".
+
+    `latency` advances the fake clock on every attempt.
+    """
+
+    def __init__(self, clock, errors=(), latency=0.0):
+        self.clock = clock
+        self.errors = list(errors)
+        self.latency = latency
+        self.attempts = 0
+
+    def execute(self):
+        self.attempts += 1
+        self.clock.now += self.latency
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+def http_error(status, headers=None, reason=None):
+    content = b""
+    if reason:
+        content = json.dumps({"error": {
+            "code": status, "message": reason, "errors": [{"reason": reason}],
+        }}).encode()
+    return HttpError(Response(dict(headers or {}, status=status)), content)
+
+
+def make_client(clock, quota=6000, **kwargs):
+    kwargs.setdefault("rng", lambda: 1.0)
+    return QuotaClient({"sheets": quota}, clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_backoff_grows_exponentially_up_to_max_delay():
+    clock = FakeClock()
+    client = make_client(clock, base_delay=1.0, max_delay=4.0, retry_budget=100)
+    request = FakeRequest(clock, [http_error(503)] * 4)
+
+    assert client.execute(request, api="sheets") == "ok"
+    assert clock.sleeps == [1.0, 2.0, 4.0, 4.0]
+    assert client.stats()["sheets"] == {
+        "calls": 5, "retries": 4, "throttles": 0, "failures": 0
+    }
+
+
+def test_jitter_scales_the_backoff():
+    clock = FakeClock()
+    client = make_client(clock, base_delay=1.0, rng=lambda: 0.25)
+    client.execute(FakeRequest(clock, [http_error(500)] * 2), api="sheets")
+
+    assert clock.sleeps == [0.25, 0.5]
+
+
+def test_gives_up_when_retry_budget_is_spent():
+    clock = FakeClock()
+    client = make_client(clock, base_delay=1.0, retry_budget=3.5)
+    request = FakeRequest(clock, [http_error(503)] * 10)
+
+    with pytest.raises(HttpError):
+        client.execute(request, api="sheets")
+
+    # 1 + 2 fits in the budget, the next 4s delay would not
+    assert clock.sleeps == [1.0, 2.0]
+    assert request.attempts == 3
+    assert client.stats()["sheets"]["failures"] == 1
+
+
+def test_gives_up_after_max_retries():
+    clock = FakeClock()
+    client = make_client(clock, base_delay=0.01, max_retries=2)
+    request = FakeRequest(clock, [http_error(502)] * 10)
+
+    with pytest.raises(HttpError):
+        client.execute(request, api="sheets")
+    assert request.attempts == 3
+
+
+def test_honours_retry_after():
+    clock = FakeClock()
+    client = make_client(clock, base_delay=1.0)
+    request = FakeRequest(clock, [http_error(429, {"retry-after": "7"})])
+
+    assert client.execute(request, api="sheets") == "ok"
+    assert clock.sleeps == [7.0]
+
+
+def test_non_retryable_errors_raise_immediately():
+    clock = FakeClock()
+    client = make_client(clock)
+    request = FakeRequest(clock, [http_error(404)])
+
+    with pytest.raises(HttpError):
+        client.execute(request, api="sheets")
+    assert request.attempts == 1
+    assert clock.sleeps == []
+
+
+def test_non_idempotent_request_raises_on_503():
+    clock = FakeClock()
+    client = make_client(clock)
+    request = FakeRequest(clock, [http_error(503)])
+
+    with pytest.raises(HttpError):
+        client.execute(request, api="sheets", idempotent=False)
+    assert request.attempts == 1
+
+
+def test_non_idempotent_request_retries_on_429():
+    clock = FakeClock()
+    client = make_client(clock, base_delay=1.0)
+    request = FakeRequest(clock, [http_error(429)])
+
+    assert client.execute(request, api="sheets", idempotent=False) == "ok"
+    assert request.attempts == 2
+
+
+def test_connection_errors_are_retried_only_when_idempotent():
+    clock = FakeClock()
+    client = make_client(clock, base_delay=0.01)
+
+    request = FakeRequest(clock, [ConnectionError()])
+    assert client.execute(request, api="sheets") == "ok"
+
+    request = FakeRequest(clock, [ConnectionError()])
+    with pytest.raises(ConnectionError):
+        client.execute(request, api="sheets", idempotent=False)
+
+
+def test_rate_limited_403_is_retried_and_counted_as_throttle():
+    clock = FakeClock()
+    client = make_client(clock, base_delay=1.0)
+    request = FakeRequest(clock, [http_error(403, reason="userRateLimitExceeded"),
+                                  http_error(403, reason="rateLimitExceeded")])
+
+    assert client.execute(request, api="sheets", idempotent=False) == "ok"
+    assert request.attempts == 3
+    assert client.stats()["sheets"] == {
+        "calls": 3, "retries": 2, "throttles": 2, "failures": 0
+    }
+
+
+def test_other_403s_are_not_retried():
+    clock = FakeClock()
+    client = make_client(clock)
+    request = FakeRequest(clock, [http_error(403, reason="exportSizeLimitExceeded")])
+
+    with pytest.raises(HttpError):
+        client.execute(request, api="sheets")
+    assert request.attempts == 1
+
+
+@pytest.mark.parametrize("error", [
+    ssl.SSLError(),
+    socket.timeout(),
+    ConnectionResetError(),
+    OSError(errno.ETIMEDOUT, "timed out"),
+    ServerNotFoundError("oauth2.googleapis.com"),
+])
+def test_transport_errors_are_retried(error):
+    clock = FakeClock()
+    client = make_client(clock, base_delay=0.01)
+
+    assert client.execute(FakeRequest(clock, [error]), api="sheets") == "ok"
+
+
+def test_other_os_errors_are_not_retried():
+    clock = FakeClock()
+    client = make_client(clock)
+
+    with pytest.raises(OSError):
+        client.execute(FakeRequest(clock, [OSError(errno.ENOSPC, "full")]), api="sheets")
+
+
+def test_per_call_overrides_shrink_the_retry_budget():
+    clock = FakeClock()
+    client = make_client(clock, base_delay=1.0, retry_budget=100)
+    request = FakeRequest(clock, [http_error(503)] * 10)
+
+    with pytest.raises(HttpError):
+        client.execute(request, api="sheets", max_retries=5, retry_budget=1.5)
+    assert clock.sleeps == [1.0]
+
+    request = FakeRequest(clock, [http_error(503)] * 10)
+    with pytest.raises(HttpError):
+        client.execute(request, api="sheets", max_retries=0)
+    assert request.attempts == 1
+
+
+def test_throttles_are_counted_when_bucket_runs_dry():
+    clock = FakeClock()
+    client = make_client(clock, quota=60)  # one token per second
+
+    for _ in range(62):
+        client.execute(FakeRequest(clock), api="sheets")
+
+    stats = client.stats()["sheets"]
+    assert stats["calls"] == 62
+    assert stats["throttles"] == 2
+    assert clock.sleeps == [pytest.approx(1.0), pytest.approx(1.0)]
+
+
+def test_latency_refills_the_bucket():
+    clock = FakeClock()
+    client = make_client(clock, quota=60)
+
+    # Each call takes a second, which pays for the next token
+    for _ in range(120):
+        client.execute(FakeRequest(clock, latency=1.0), api="sheets")
+
+    assert client.stats()["sheets"]["throttles"] == 0
+
+
+def test_token_bucket_reports_wait():
+    clock = FakeClock()
+    bucket = TokenBucket(2, clock=clock, sleep=clock.sleep)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == pytest.approx(30.0)
@@ -0,0 +1,134 @@
+import csv
+import io
+
+import pandas as pd
+import pytest
+
+from sheet_data import (
+    USED_COLUMNS, column_letter, frame_from_columns, frame_from_csv, locale_dayfirst,
+    sheet_dates,
+)
+
+HEADER = ["Division", "Clients", "Affiliate", "Date", "Status", "Remarks"]
+
+
+def fake_sheet(n_rows, dayfirst=True):
+    # Formatted cells as the sheet displays them: blanks, codes with
+    # leading zeros, quotes, commas and line breaks inside cells.
+    rows = []
+    for i in range(n_rows):
+        day, month = i % 28 + 1, i % 12 + 1
+        date = f"{day:02}/{month:02}/2025" if dayfirst else f"{month:02}/{day:02}/2025"
+        rows.append([
+            f"D{i % 3}",
+            ["0123", 'Acme "UK"', "Smith, Jones\nLtd", ""][i % 4],
+            "" if i % 5 == 0 else f"A{i % 7}",
+            "" if i % 11 == 0 else date,
+            ["Won", "Lost", "Pending"][i % 3],
+            "follow up\nnext week, call back\n" * (i % 3),
+        ])
+    # A trailing blank row in the used columns exercises the values API's
+    # per-column trimming
+    rows.append(["", "", "", "", "", "trailing remark"])
+    return rows
+
+
+def values_arrays(rows, columns=USED_COLUMNS):
+    # What values.batchGet returns per column: trailing blanks trimmed
+    arrays = []
+    for name in columns:
+        column = [row[HEADER.index(name)] for row in rows]
+        while column and column[-1] == "":
+            column.pop()
+        arrays.append(column)
+    return arrays
+
+
+def csv_export(rows):
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\r\n")
+    writer.writerow(HEADER)
+    writer.writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+@pytest.mark.parametrize("index, letters", [(0, "A"), (25, "Z"), (26, "AA"), (701, "ZZ"), (702, "AAA")])
+def test_column_letter(index, letters):
+    assert column_letter(index) == letters
+
+
+@pytest.mark.parametrize("locale, dayfirst", [
+    ("en_GB", True), ("de_DE", True), ("en_US", False), ("ja_JP", False),
+])
+def test_locale_dayfirst(locale, dayfirst):
+    assert locale_dayfirst(locale) is dayfirst
+
+
+def test_ragged_columns_are_padded_with_blanks():
+    df = frame_from_columns(
+        ["Division", "Clients", "Status"],
+        [["D1", "D2", "D3"], ["C1"], ["Open", "", "Won"]],
+    )
+
+    assert df["Clients"].tolist() == ["C1", "", ""]
+    assert df["Status"].tolist() == ["Open", "", "Won"]
+    assert df["Division"].dtype == object
+
+
+def test_blank_cells_stay_empty_strings():
+    df = frame_from_columns(["Clients", "Date"], [["", "0123"], ["", "05/01/2025"]])
+
+    assert df["Clients"].tolist() == ["", "0123"]
+    assert df["Date"].isna().tolist() == [True, False]
+
+
+@pytest.mark.parametrize("dayfirst, expected", [
+    (True, "2025-01-05"),   # en_GB: 5 January
+    (False, "2025-05-01"),  # en_US: 1 May
+])
+def test_ambiguous_dates_follow_the_locale(dayfirst, expected):
+    df = frame_from_columns(["Date"], [["05/01/2025"]], dayfirst=dayfirst)
+
+    assert df["Date"][0] == pd.Timestamp(expected)
+
+
+def test_iso_text_is_read_as_iso_alongside_locale_dates():
+    dates = sheet_dates(["2025-01-05", "05/02/2025", "", "not a date"], dayfirst=True)
+
+    assert dates[0] == pd.Timestamp("2025-01-05")
+    assert dates[1] == pd.Timestamp("2025-02-05")
+    assert dates[2:].isna().all()
+
+    # Order must not matter: a locale date first must not set the format
+    dates = sheet_dates(["05/02/2025", "2025-01-05", "13/02/2025"], dayfirst=True)
+    assert dates.tolist() == [pd.Timestamp("2025-02-05"), pd.Timestamp("2025-01-05"),
+                              pd.Timestamp("2025-02-13")]
+
+
+def test_csv_with_multiline_cells_spanning_parse_chunks():
+    # pyarrow splits input into ~1 MB blocks; quoted line breaks must not
+    # throw the chunker out of sync with the parser.
+    rows = fake_sheet(30000)
+    data = csv_export(rows)
+    assert len(data) > 1 << 20
+
+    df = frame_from_csv(data, dayfirst=True)
+
+    # The trailing row is blank in every used column and is dropped
+    assert len(df) == len(rows) - 1
+    assert df["Clients"][2] == "Smith, Jones\nLtd"
+    assert df["Status"].tolist() == [row[4] for row in rows[:-1]]
+
+
+@pytest.mark.parametrize("dayfirst", [True, False])
+def test_values_and_csv_paths_build_the_same_frame(dayfirst):
+    rows = fake_sheet(30000, dayfirst)
+
+    from_values = frame_from_columns(USED_COLUMNS, values_arrays(rows), dayfirst)
+    from_csv = frame_from_csv(csv_export(rows), dayfirst=dayfirst)
+
+    pd.testing.assert_frame_equal(from_values, from_csv)
+    assert from_values["Clients"][1] == 'Acme "UK"'
+    assert from_values["Affiliate"][0] == ""
+    assert from_values["Date"][1] == pd.Timestamp("2025-02-02")
+    assert from_values["Date"][13] == pd.Timestamp("2025-02-14")